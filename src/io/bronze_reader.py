@@ -10,15 +10,41 @@ NO PANDAS DEPENDENCY - Returns list of dicts or PyArrow Table.
 from __future__ import annotations
 
 import gzip
+import io
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Generator, List, Optional
 
 import pyarrow as pa
+import pyarrow.json as pj
+
+from src.schemas import TEXT_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+# Ingestion metadata stays text; everything else is inferred per page
+_PARSE_OPTIONS = pj.ParseOptions(
+    explicit_schema=pa.schema([
+        ("_ingestion_date", pa.string()),
+        ("_run_id", pa.string()),
+        ("_ingested_at", pa.string()),
+    ]),
+    unexpected_field_behavior="infer",
+)
+
+
+def _cast_text_columns(table: pa.Table) -> pa.Table:
+    """Cast Silver text columns inferred as another type (numbers, all-null) to string."""
+    schema = table.schema
+    if all(field.type == pa.string() for field in schema if field.name in TEXT_COLUMNS):
+        return table
+    return table.cast(pa.schema([
+        field.with_type(pa.string()) if field.name in TEXT_COLUMNS else field
+        for field in schema
+    ]))
+
 
 class BronzeReader:
     """
@@ -88,6 +114,42 @@ class BronzeReader:
         logger.info(f"Total records read: {len(all_records)}")
         return all_records
     
+    def _read_page_as_arrow(self, file_path: Path) -> Optional[pa.Table]:
+        """Parse a single JSONL.gz page into Arrow, or None if it is empty."""
+        logger.debug(f"Reading file: {file_path}")
+        data = gzip.decompress(file_path.read_bytes())
+        if not data.strip():
+            return None
+        # Text columns are not pinned in the parser, which would reject a JSON number
+        # such as a numeric postal_code; each page is cast instead, so pages concat cleanly
+        table = pj.read_json(io.BytesIO(data), parse_options=_PARSE_OPTIONS)
+        return _cast_text_columns(table)
+    
+    def read_run_directory_as_arrow(self, run_dir: Path) -> pa.Table:
+        """
+        Read all records from a run directory straight into a PyArrow Table.
+        
+        Pages are parsed by Arrow's C++ JSON reader, so strings land in
+        Arrow buffers without a Python object per field.
+        """
+        page_files = sorted(run_dir.glob("page=*.jsonl.gz"))
+        logger.info(f"Found {len(page_files)} page files in {run_dir}")
+        
+        # Inflate and JSON parsing both release the GIL, so pages are read concurrently
+        if len(page_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(page_files))) as executor:
+                pages = list(executor.map(self._read_page_as_arrow, page_files))
+        else:
+            pages = [self._read_page_as_arrow(page_file) for page_file in page_files]
+        
+        tables = [page for page in pages if page is not None]
+        if not tables:
+            return pa.table({})
+        
+        table = pa.concat_tables(tables, promote_options="permissive")
+        logger.info(f"Total records read: {table.num_rows}")
+        return table
+    
     def read_latest_run_as_list(self) -> List[Dict[str, Any]]:
         """Read the latest run as a list of dictionaries."""
         latest_path = self.get_latest_run_path()
@@ -100,8 +162,13 @@ class BronzeReader:
     
     def read_latest_run_as_arrow(self) -> pa.Table:
         """Read the latest run as a PyArrow Table."""
-        records = self.read_latest_run_as_list()
-        return pa.Table.from_pylist(records)
+        latest_path = self.get_latest_run_path()
+        
+        if latest_path is None:
+            raise FileNotFoundError(f"No bronze data found in {self.base_dir}")
+        
+        logger.info(f"Reading latest run from: {latest_path}")
+        return self.read_run_directory_as_arrow(latest_path)
     
     def read_run_as_list(self, ingestion_date: str, run_id: str) -> List[Dict[str, Any]]:
         """Read a specific run as a list of dictionaries."""
@@ -114,8 +181,12 @@ class BronzeReader:
     
     def read_run_as_arrow(self, ingestion_date: str, run_id: str) -> pa.Table:
         """Read a specific run as a PyArrow Table."""
-        records = self.read_run_as_list(ingestion_date, run_id)
-        return pa.Table.from_pylist(records)
+        run_dir = self.base_dir / f"ingestion_date={ingestion_date}" / f"run_id={run_id}"
+        
+        if not run_dir.exists():
+            raise FileNotFoundError(f"Run not found: {run_dir}")
+        
+        return self.read_run_directory_as_arrow(run_dir)
     
     def read_manifest(self, run_dir: Path) -> Optional[Dict[str, Any]]:
         """Read the manifest file from a run directory."""
@@ -8,15 +8,18 @@ in JSONL (gzipped) format with proper partitioning.
 from __future__ import annotations
 
 import gzip
-import json
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+_METADATA_KEYS = frozenset({"_ingestion_date", "_run_id", "_ingested_at"})
+
 
 @dataclass
 class RawJsonlGzWriter:
@@ -30,6 +33,7 @@ class RawJsonlGzWriter:
         base_dir: Base directory for raw data storage
         ingestion_date: Date of ingestion (YYYY-MM-DD format)
         run_id: Unique identifier for this run
+        compresslevel: gzip compression level (1 = fastest, 9 = smallest)
         
     Example:
         >>> writer = RawJsonlGzWriter(base_dir="data/bronze/breweries")
@@ -40,6 +44,7 @@ class RawJsonlGzWriter:
     base_dir: Path | str = "data/bronze/breweries"
     ingestion_date: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d"))
     run_id: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S"))
+    compresslevel: int = 9
     
     # Track written pages for manifest
     _written_pages: List[Dict[str, Any]] = field(default_factory=list, repr=False)
@@ -56,6 +61,11 @@ class RawJsonlGzWriter:
         out_dir.mkdir(parents=True, exist_ok=True)
         return out_dir
 
+    @property
+    def written_page_names(self) -> List[str]:
+        """File names of the pages written so far, in write order."""
+        return [p["file"] for p in self._written_pages]
+
     def write_page(
         self, 
         page: int, 
@@ -73,18 +83,58 @@ class RawJsonlGzWriter:
         Returns:
             Path to the written file
         """
-        out_path = self.run_dir / f"page={page:04d}.jsonl.gz"
+        out_path = self._page_path(page)
         record_count = 0
         
-        with gzip.open(out_path, "wt", encoding="utf-8") as f:
+        # Metadata is identical for the whole page, so it is encoded once and
+        # spliced in place of each record's closing brace
+        metadata = self._metadata()
+        meta_tail = b"," + orjson.dumps(metadata)[1:] + b"\n"
+        
+        # orjson emits UTF-8 bytes directly, so the gzip stream skips text encoding
+        with gzip.open(out_path, "wb", compresslevel=self.compresslevel) as f:
             for rec in records:
-                if add_metadata:
-                    rec = self._add_metadata(rec)
-                f.write(json.dumps(rec, ensure_ascii=False))
-                f.write("\n")
+                if not add_metadata:
+                    f.write(orjson.dumps(rec) + b"\n")
+                elif not rec:
+                    f.write(b"{" + meta_tail[1:])
+                elif _METADATA_KEYS.isdisjoint(rec):
+                    f.write(orjson.dumps(rec)[:-1] + meta_tail)
+                else:
+                    # Splicing would duplicate keys the record already carries
+                    f.write(orjson.dumps({**rec, **metadata}) + b"\n")
                 record_count += 1
         
-        # Track for manifest
+        self._track_page(page, out_path, record_count)
+        return out_path
+
+    def write_page_bytes(self, page: int, data: bytes, record_count: int) -> Path:
+        """
+        Write a page of already-serialized JSONL bytes to a gzipped file.
+        
+        Skips per-record serialization entirely, so no metadata is added;
+        callers pass the bytes exactly as they should land on disk.
+        
+        Args:
+            page: Page number (used in filename)
+            data: Newline-delimited JSON records as UTF-8 bytes
+            record_count: Number of records contained in ``data``
+            
+        Returns:
+            Path to the written file
+        """
+        out_path = self._page_path(page)
+        out_path.write_bytes(gzip.compress(data, compresslevel=self.compresslevel))
+        
+        self._track_page(page, out_path, record_count)
+        return out_path
+
+    def _page_path(self, page: int) -> Path:
+        """Get the output path for a page number."""
+        return self.run_dir / f"page={page:04d}.jsonl.gz"
+
+    def _track_page(self, page: int, out_path: Path, record_count: int) -> None:
+        """Record a written page for the manifest."""
         self._written_pages.append({
             "page": page,
             "file": out_path.name,
@@ -92,12 +142,10 @@ class RawJsonlGzWriter:
         })
         
         logger.info(f"Written page {page} with {record_count} records to {out_path}")
-        return out_path
 
-    def _add_metadata(self, record: Dict[str, Any]) -> Dict[str, Any]:
-        """Add ingestion metadata to a record."""
+    def _metadata(self) -> Dict[str, str]:
+        """Ingestion metadata stamped onto written records."""
         return {
-            **record,
             "_ingestion_date": self.ingestion_date,
             "_run_id": self.run_id,
             "_ingested_at": datetime.now(timezone.utc).isoformat()
@@ -124,10 +172,7 @@ class RawJsonlGzWriter:
         }
         
         out_path = self.run_dir / "_manifest.json"
-        out_path.write_text(
-            json.dumps(manifest, ensure_ascii=False, indent=2), 
-            encoding="utf-8"
-        )
+        out_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Written manifest to {out_path}")
         return out_path
@@ -17,13 +17,15 @@ Usage:
 """
 
 import logging
+import shutil
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Optional
 
-import duckdb
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 from deltalake import DeltaTable, write_deltalake
 
 # Add project root to path for imports
@@ -32,6 +34,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.io.bronze_reader import BronzeReader
 from src.transforms.silver_transforms import (
     DuckDBTransformer,
+    SILVER_SCHEMA,
     transform_bronze_to_silver,
     get_transformation_summary,
 )
@@ -70,7 +73,8 @@ class SilverLayerPipeline:
         self,
         bronze_dir: str = "data/bronze/breweries",
         silver_dir: str = "data/silver/breweries",
-        partition_cols: Optional[List[str]] = None
+        partition_cols: Optional[List[str]] = None,
+        output_format: str = "delta"
     ):
         """
         Initialize the Silver layer pipeline.
@@ -79,10 +83,15 @@ class SilverLayerPipeline:
             bronze_dir: Path to Bronze layer data
             silver_dir: Path to Silver layer output (Delta Lake)
             partition_cols: Columns for partitioning (default: country, state_province)
+            output_format: "delta" (default) or "parquet" (written directly by DuckDB)
         """
+        if output_format not in ("delta", "parquet"):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        
         self.bronze_dir = Path(bronze_dir)
         self.silver_dir = Path(silver_dir)
         self.partition_cols = partition_cols or ["country", "state_province"]
+        self.output_format = output_format
         
         self.reader = BronzeReader(base_dir=bronze_dir)
         self.transformer = DuckDBTransformer()
@@ -111,36 +120,45 @@ class SilverLayerPipeline:
         start_time = datetime.now(timezone.utc)
         
         try:
+            if mode not in ("overwrite", "append"):
+                raise ValueError(f"Unsupported write mode: {mode}")
+            
             # Step 1: Read Bronze data as PyArrow Table
             logger.info("Step 1: Reading Bronze layer data...")
             bronze_table = self._read_bronze_data(ingestion_date, run_id)
             logger.info(f"Read {bronze_table.num_rows} records from Bronze layer")
             
-            # Step 2: Transform data using DuckDB
-            logger.info("Step 2: Transforming with DuckDB...")
-            silver_table = self.transformer.transform_bronze_to_silver(bronze_table)
-            
-            # Step 3: Write to Delta Lake
-            logger.info("Step 3: Writing to Delta Lake...")
-            self._write_delta_lake(silver_table, mode)
+            if self.output_format == "parquet":
+                # Steps 2-3: Transform and write Parquet without leaving DuckDB
+                logger.info("Steps 2-3: Transforming and writing Parquet with DuckDB...")
+                silver_table = self._write_parquet(bronze_table, mode)
+            else:
+                # Step 2: Transform data using DuckDB
+                logger.info("Step 2: Transforming with DuckDB...")
+                silver_table = self.transformer.transform_bronze_to_silver(bronze_table)
+                
+                # Step 3: Write to Delta Lake
+                logger.info("Step 3: Writing to Delta Lake...")
+                self._write_delta_lake(silver_table, mode)
             
             # Generate summary
             summary = self.transformer.get_transformation_summary(bronze_table, silver_table)
             summary["status"] = "success"
             summary["silver_dir"] = str(self.silver_dir)
-            summary["format"] = "delta"
+            summary["format"] = self.output_format
             summary["engine"] = "duckdb+pyarrow"
             summary["start_time"] = start_time.isoformat()
             summary["end_time"] = datetime.now(timezone.utc).isoformat()
             summary["partition_columns"] = self.partition_cols
             
             # Get Delta Lake info
-            summary["delta_info"] = self._get_delta_info()
+            if self.output_format == "delta":
+                summary["delta_info"] = self._get_delta_info()
             
             logger.info("=" * 60)
             logger.info("Silver Layer Pipeline Completed Successfully!")
             logger.info(f"Records transformed: {summary['silver_record_count']}")
-            logger.info(f"Format: Delta Lake (DuckDB + PyArrow)")
+            logger.info(f"Format: {self.output_format} (DuckDB + PyArrow)")
             logger.info(f"Output directory: {self.silver_dir}")
             logger.info("=" * 60)
             
@@ -159,12 +177,8 @@ class SilverLayerPipeline:
     ) -> pa.Table:
         """Read data from Bronze layer as PyArrow Table."""
         if ingestion_date and run_id:
-            data = self.reader.read_run_as_list(ingestion_date, run_id)
-        else:
-            data = self.reader.read_latest_run_as_list()
-        
-        # Convert list of dicts to PyArrow Table
-        return pa.Table.from_pylist(data)
+            return self.reader.read_run_as_arrow(ingestion_date, run_id)
+        return self.reader.read_latest_run_as_arrow()
     
     def _write_delta_lake(self, table: pa.Table, mode: str = "overwrite") -> None:
         """
@@ -190,25 +204,100 @@ class SilverLayerPipeline:
         
         logger.info(f"Written Delta Lake table to {self.silver_dir}")
         
-        # Log partition info using DuckDB
-        conn = duckdb.connect(":memory:")
-        conn.register("t", table)
-        partition_count = conn.execute(f"""
-            SELECT COUNT(DISTINCT ({', '.join(self.partition_cols)}))
-            FROM t
-        """).fetchone()[0]
-        conn.close()
+        # Log partition info from the Delta file list (no second pass over the data)
+        if logger.isEnabledFor(logging.INFO):
+            files = DeltaTable(str(self.silver_dir)).file_uris()
+            partition_count = len({Path(f).parent for f in files})
+            logger.info(f"Delta table has {partition_count} unique partitions")
+    
+    def _write_parquet(self, bronze_table: pa.Table, mode: str = "overwrite") -> pa.Table | ds.Dataset:
+        """
+        Transform Bronze data and write partitioned Parquet directly from DuckDB.
+        
+        An overwrite is written to a sibling staging directory and only replaces
+        silver_dir once the COPY has succeeded. A directory holding a Delta table
+        is never written to.
         
-        logger.info(f"Created {partition_count} unique partitions")
+        Args:
+            bronze_table: Raw Bronze PyArrow Table
+            mode: "overwrite" or "append"
+            
+        Returns:
+            Dataset over the files written by this run, so the summary never counts earlier runs
+            
+        Raises:
+            ValueError: If silver_dir already holds a Delta table
+        """
+        if (self.silver_dir / "_delta_log").exists():
+            raise ValueError(
+                f"{self.silver_dir} holds a Delta table; write Parquet to another directory"
+            )
+        
+        # Overwrites go to a staging directory so a failed run leaves the old output in place
+        if mode == "overwrite":
+            target = self.silver_dir.with_name(f"{self.silver_dir.name}.staging")
+            if target.exists():
+                shutil.rmtree(target)
+        else:
+            target = self.silver_dir
+        target.mkdir(parents=True, exist_ok=True)
+        existing = set(self.silver_dir.rglob("*.parquet")) if mode == "append" else set()
+        
+        logger.info(f"Writing Parquet with mode='{mode}'")
+        logger.info(f"Partitioning by: {self.partition_cols}")
+        
+        try:
+            written = self.transformer.transform_and_write(
+                bronze_table, target, self.partition_cols
+            )
+        except Exception:
+            if mode == "overwrite":
+                shutil.rmtree(target, ignore_errors=True)
+            raise
+        
+        if mode == "overwrite":
+            self._swap_in(target)
+        logger.info(f"Written {written} records as Parquet to {self.silver_dir}")
+        
+        new_files = sorted(str(f) for f in set(self.silver_dir.rglob("*.parquet")) - existing)
+        if logger.isEnabledFor(logging.INFO):
+            partition_count = len({Path(f).parent for f in new_files})
+            logger.info(f"Parquet run wrote {partition_count} unique partitions")
+        
+        if not new_files:
+            return SILVER_SCHEMA.empty_table()
+        dataset = ds.dataset(
+            new_files,
+            format="parquet",
+            partitioning="hive",
+            partition_base_dir=str(self.silver_dir),
+        )
+        return dataset
+    
+    def _swap_in(self, staging_dir: Path) -> None:
+        """Replace the Silver directory with a fully written staging directory."""
+        previous = self.silver_dir.with_name(f"{self.silver_dir.name}.previous")
+        if previous.exists():
+            shutil.rmtree(previous)
+        if self.silver_dir.exists():
+            self.silver_dir.rename(previous)
+        staging_dir.rename(self.silver_dir)
+        shutil.rmtree(previous, ignore_errors=True)
     
     def _get_delta_info(self) -> dict:
         """Get Delta Lake table information."""
         try:
             dt = DeltaTable(str(self.silver_dir))
+            # Row count from the per-file stats in the Delta log, not a full table read
+            num_records = pa.table(dt.get_add_actions(flatten=True)).column("num_records")
+            if num_records.null_count:
+                # Files written without stats have no count in the log, so scan instead
+                num_rows = dt.to_pyarrow_dataset().count_rows()
+            else:
+                num_rows = pc.sum(num_records).as_py() or 0
             return {
                 "version": dt.version(),
-                "num_rows": dt.to_pyarrow_table().num_rows  # 
-
+                "num_rows": num_rows
             }
         except Exception as e:
             logger.warning(f"Could not get Delta info: {e}")
@@ -232,7 +321,8 @@ class SilverLayerPipeline:
 def run_silver_pipeline(
     bronze_dir: str = "data/bronze/breweries",
     silver_dir: str = "data/silver/breweries",
-    mode: str = "overwrite"
+    mode: str = "overwrite",
+    output_format: str = "delta"
 ) -> dict:
     """
     Convenience function to run the Silver layer pipeline.
@@ -241,13 +331,15 @@ def run_silver_pipeline(
         bronze_dir: Path to Bronze layer
         silver_dir: Path to Silver layer output
         mode: Write mode ("overwrite" or "append")
+        output_format: "delta" or "parquet"
         
     Returns:
         Pipeline execution summary
     """
     pipeline = SilverLayerPipeline(
         bronze_dir=bronze_dir,
-        silver_dir=silver_dir
+        silver_dir=silver_dir,
+        output_format=output_format
     )
     return pipeline.run(mode=mode)
 
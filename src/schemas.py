@@ -0,0 +1,28 @@
+"""
+Shared Silver Schema.
+
+Column names and types used by both the Bronze reader and the
+Silver transforms. Depends only on PyArrow.
+"""
+
+from __future__ import annotations
+
+import pyarrow as pa
+
+# Single source for Silver columns and types.
+# brewery_type has a handful of values, so it is dictionary-encoded (integer codes).
+# country/state_province stay plain strings: Delta Lake rejects dictionary partition columns.
+SILVER_SCHEMA = pa.schema([
+    ("id", pa.string()), ("name", pa.string()), ("brewery_type", pa.dictionary(pa.int32(), pa.string())),
+    ("address_1", pa.string()), ("address_2", pa.string()), ("address_3", pa.string()),
+    ("city", pa.string()), ("state_province", pa.string()), ("postal_code", pa.string()),
+    ("country", pa.string()), ("longitude", pa.float64()), ("latitude", pa.float64()),
+    ("phone", pa.string()), ("website_url", pa.string()),
+])
+
+SILVER_COLUMNS = SILVER_SCHEMA.names
+
+# Columns that are text in Silver, computed once from SILVER_SCHEMA
+TEXT_COLUMNS = frozenset(
+    field.name for field in SILVER_SCHEMA if not pa.types.is_floating(field.type)
+)
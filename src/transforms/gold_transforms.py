@@ -10,15 +10,51 @@ from typing import List, Optional
 
 import duckdb
 import pyarrow as pa
+import pyarrow.compute as pc
 
 logger = logging.getLogger(__name__)
 
+# Below this many rows a group-by is cheaper in Arrow than a DuckDB query
+SMALL_INPUT_THRESHOLD = 10_000
+
+
+def _group_count_arrow(table: pa.Table, group_cols: List[str], sort_keys: List[tuple]) -> pa.Table:
+    """Count rows per group with Arrow's hash aggregation, shaped like the DuckDB result."""
+    result = table.group_by(group_cols, use_threads=False).aggregate([([], "count_all")])
+    result = result.rename_columns(group_cols + ["brewery_count"])
+    
+    # DuckDB returns plain values for dictionary-encoded keys
+    for i, field in enumerate(result.schema):
+        if pa.types.is_dictionary(field.type):
+            result = result.set_column(i, field.name, result.column(i).cast(field.type.value_type))
+    
+    return result.sort_by(sort_keys)
+
 
 class DuckDBAggregator:
     """DuckDB-based aggregator for Gold layer. No Pandas."""
     
-    def __init__(self):
-        self.conn = duckdb.connect(":memory:")
+    def __init__(
+        self,
+        conn: Optional[duckdb.DuckDBPyConnection] = None,
+        small_input_threshold: int = SMALL_INPUT_THRESHOLD,
+        table: Optional[pa.Table] = None,
+    ):
+        # An injected connection is shared with the caller, who closes it
+        self._owns_conn = conn is None
+        self.conn = duckdb.connect(":memory:") if conn is None else conn
+        self.small_input_threshold = small_input_threshold
+        self._attached: Optional[pa.Table] = None
+        if table is not None:
+            self.attach(table)
+    
+    def attach(self, table: pa.Table) -> None:
+        """Register the Silver table as the `silver` view, once per table."""
+        # A shared connection's view may have been replaced by another aggregator
+        if self._owns_conn and self._attached is table:
+            return
+        self.conn.register("silver", table)
+        self._attached = table
     
     def aggregate_by_type_and_location(
         self,
@@ -33,7 +69,13 @@ class DuckDBAggregator:
             return pa.Table.from_pylist([], schema=schema)
         
         logger.info(f"Aggregating by: {group_cols}")
-        self.conn.register("silver", table)
+        if table.num_rows < self.small_input_threshold:
+            sort_keys = [(col, "ascending") for col in ("country", "state_province") if col in group_cols]
+            result = _group_count_arrow(table, group_cols, sort_keys + [("brewery_count", "descending")])
+            logger.info(f"Created {result.num_rows} aggregated rows")
+            return result
+        
+        self.attach(table)
         
         group_cols_sql = ", ".join(f'"{col}"' for col in group_cols)
         order_cols = []
@@ -59,10 +101,13 @@ class DuckDBAggregator:
         if table.num_rows == 0:
             return pa.Table.from_pylist([], schema=pa.schema([("brewery_type", pa.string()), ("brewery_count", pa.int64())]))
         
-        self.conn.register("silver_type", table)
+        if table.num_rows < self.small_input_threshold:
+            return _group_count_arrow(table, ["brewery_type"], [("brewery_count", "descending")])
+        
+        self.attach(table)
         return self.conn.execute("""
             SELECT brewery_type, COUNT(*)::BIGINT as brewery_count
-            FROM silver_type GROUP BY brewery_type ORDER BY brewery_count DESC
+            FROM silver GROUP BY brewery_type ORDER BY brewery_count DESC
         """).fetch_arrow_table()
     
     def aggregate_by_country(self, table: pa.Table) -> pa.Table:
@@ -70,10 +115,13 @@ class DuckDBAggregator:
         if table.num_rows == 0:
             return pa.Table.from_pylist([], schema=pa.schema([("country", pa.string()), ("brewery_count", pa.int64())]))
         
-        self.conn.register("silver_country", table)
+        if table.num_rows < self.small_input_threshold:
+            return _group_count_arrow(table, ["country"], [("brewery_count", "descending")])
+        
+        self.attach(table)
         return self.conn.execute("""
             SELECT country, COUNT(*)::BIGINT as brewery_count
-            FROM silver_country GROUP BY country ORDER BY brewery_count DESC
+            FROM silver GROUP BY country ORDER BY brewery_count DESC
         """).fetch_arrow_table()
     
     def aggregate_by_state(self, table: pa.Table, country: Optional[str] = None) -> pa.Table:
@@ -83,17 +131,22 @@ class DuckDBAggregator:
                 ("country", pa.string()), ("state_province", pa.string()), ("brewery_count", pa.int64())
             ]))
         
-        self.conn.register("silver_state", table)
+        if table.num_rows < self.small_input_threshold:
+            if country:
+                table = table.filter(pc.equal(table["country"], country))
+            return _group_count_arrow(table, ["country", "state_province"], [("brewery_count", "descending")])
+        
+        self.attach(table)
         if country:
             sql = f"""
                 SELECT country, state_province, COUNT(*)::BIGINT as brewery_count
-                FROM silver_state WHERE country = '{country}'
+                FROM silver WHERE country = '{country}'
                 GROUP BY country, state_province ORDER BY brewery_count DESC
             """
         else:
             sql = """
                 SELECT country, state_province, COUNT(*)::BIGINT as brewery_count
-                FROM silver_state GROUP BY country, state_province ORDER BY brewery_count DESC
+                FROM silver GROUP BY country, state_province ORDER BY brewery_count DESC
             """
         return self.conn.execute(sql).fetch_arrow_table()
     
@@ -103,11 +156,12 @@ class DuckDBAggregator:
             return {"total_breweries": 0, "total_countries": 0, "total_states": 0, "total_types": 0,
                     "by_type": [], "by_country": [], "top_states": []}
         
-        self.conn.register("silver_summary", table)
+        self.attach(table)
         totals = self.conn.execute("""
             SELECT COUNT(*), COUNT(DISTINCT country), COUNT(DISTINCT state_province), COUNT(DISTINCT brewery_type)
-            FROM silver_summary
+            FROM silver
         """).fetchone()
+        assert totals is not None
         
         return {
             "total_breweries": totals[0],
@@ -131,6 +185,7 @@ class DuckDBAggregator:
                    COUNT(DISTINCT brewery_type), ROUND(AVG(brewery_count), 2), MAX(brewery_count), MIN(brewery_count)
             FROM gold_stats
         """).fetchone()
+        assert stats is not None
         
         return {
             "total_rows": int(stats[0]),
@@ -144,47 +199,48 @@ class DuckDBAggregator:
         }
     
     def close(self):
-        self.conn.close()
+        if self._owns_conn:
+            self.conn.close()
 
 
 # Convenience functions
-def aggregate_by_type_and_location(table: pa.Table, group_cols: Optional[List[str]] = None) -> pa.Table:
-    agg = DuckDBAggregator()
+def aggregate_by_type_and_location(table: pa.Table, group_cols: Optional[List[str]] = None, conn: Optional[duckdb.DuckDBPyConnection] = None) -> pa.Table:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.aggregate_by_type_and_location(table, group_cols)
     finally:
         agg.close()
 
-def aggregate_by_type(table: pa.Table) -> pa.Table:
-    agg = DuckDBAggregator()
+def aggregate_by_type(table: pa.Table, conn: Optional[duckdb.DuckDBPyConnection] = None) -> pa.Table:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.aggregate_by_type(table)
     finally:
         agg.close()
 
-def aggregate_by_country(table: pa.Table) -> pa.Table:
-    agg = DuckDBAggregator()
+def aggregate_by_country(table: pa.Table, conn: Optional[duckdb.DuckDBPyConnection] = None) -> pa.Table:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.aggregate_by_country(table)
     finally:
         agg.close()
 
-def aggregate_by_state(table: pa.Table, country: Optional[str] = None) -> pa.Table:
-    agg = DuckDBAggregator()
+def aggregate_by_state(table: pa.Table, country: Optional[str] = None, conn: Optional[duckdb.DuckDBPyConnection] = None) -> pa.Table:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.aggregate_by_state(table, country)
     finally:
         agg.close()
 
-def create_gold_summary(table: pa.Table) -> dict:
-    agg = DuckDBAggregator()
+def create_gold_summary(table: pa.Table, conn: Optional[duckdb.DuckDBPyConnection] = None) -> dict:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.create_gold_summary(table)
     finally:
         agg.close()
 
-def get_aggregation_stats(gold_table: pa.Table) -> dict:
-    agg = DuckDBAggregator()
+def get_aggregation_stats(gold_table: pa.Table, conn: Optional[duckdb.DuckDBPyConnection] = None) -> dict:
+    agg = DuckDBAggregator(conn)
     try:
         return agg.get_aggregation_stats(gold_table)
     finally:
@@ -6,31 +6,61 @@ NO PANDAS DEPENDENCY.
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import List, Optional, Any
 
 import duckdb
 import pyarrow as pa
+import pyarrow.dataset as ds
 
-logger = logging.getLogger(__name__)
+from src.schemas import SILVER_COLUMNS, SILVER_SCHEMA, TEXT_COLUMNS
 
-SILVER_COLUMNS = [
-    "id", "name", "brewery_type", "address_1", "address_2", "address_3",
-    "city", "state_province", "postal_code", "country",
-    "longitude", "latitude", "phone", "website_url",
-]
+logger = logging.getLogger(__name__)
 
-VALID_BREWERY_TYPES = [
+VALID_BREWERY_TYPES: frozenset[str] = frozenset({
     "micro", "nano", "regional", "brewpub", "large",
     "planning", "bar", "contract", "proprietor", "closed",
-]
+})
+
+SILVER_TRANSFORM_SQL = """
+WITH cleaned AS (
+    SELECT
+        id,
+        TRIM(name) as name,
+        TRIM(LOWER(brewery_type)) as brewery_type,
+        TRIM(address_1) as address_1,
+        TRIM(address_2) as address_2,
+        TRIM(address_3) as address_3,
+        TRIM(city) as city,
+        COALESCE(NULLIF(TRIM(state_province), ''), 'Unknown') as state_province,
+        TRIM(postal_code) as postal_code,
+        COALESCE(NULLIF(TRIM(country), ''), 'Unknown') as country,
+        TRY_CAST(longitude AS DOUBLE) as longitude,
+        TRY_CAST(latitude AS DOUBLE) as latitude,
+        TRIM(phone) as phone,
+        TRIM(website_url) as website_url
+    FROM bronze
+    WHERE id IS NOT NULL
+),
+validated AS (
+    SELECT * REPLACE (
+        CASE WHEN abs(longitude) <= 180 THEN longitude END as longitude,
+        CASE WHEN abs(latitude) <= 90 THEN latitude END as latitude
+    )
+    FROM cleaned
+),
+deduplicated AS (
+    SELECT DISTINCT ON (id) *
+    FROM validated
+)
+"""
+
 
-SILVER_SCHEMA = pa.schema([
-    ("id", pa.string()), ("name", pa.string()), ("brewery_type", pa.string()),
-    ("address_1", pa.string()), ("address_2", pa.string()), ("address_3", pa.string()),
-    ("city", pa.string()), ("state_province", pa.string()), ("postal_code", pa.string()),
-    ("country", pa.string()), ("longitude", pa.float64()), ("latitude", pa.float64()),
-    ("phone", pa.string()), ("website_url", pa.string()),
-])
+def _warn_unknown_types(brewery_types: set) -> None:
+    """Log brewery types outside VALID_BREWERY_TYPES."""
+    unknown_types = brewery_types - VALID_BREWERY_TYPES
+    if unknown_types:
+        logger.warning(f"Unknown brewery types: {sorted(unknown_types)}")
 
 
 class DuckDBTransformer:
@@ -38,82 +68,132 @@ class DuckDBTransformer:
     
     def __init__(self):
         self.conn = duckdb.connect(":memory:")
+        # Row order is fixed by the explicit ORDER BY, so let scans and writes run fully parallel
+        self.conn.execute("SET preserve_insertion_order = false")
+        self._attached: Optional[pa.Table | ds.Dataset] = None
+        self._stats_cache: Optional[tuple] = None
     
-    def transform_bronze_to_silver(self, bronze_data: pa.Table | list[dict]) -> pa.Table:
-        """Transform Bronze data to Silver."""
-        # Convert input to list if PyArrow Table
+    def attach(self, table: pa.Table | ds.Dataset) -> None:
+        """Register the Silver table as the `silver` view, once per table."""
+        if self._attached is table:
+            return
+        self.conn.register("silver", table)
+        self._attached = table
+    
+    def _register_bronze(self, bronze_data: pa.Table | list[dict]) -> int:
+        """Normalize Bronze data and register it as the `bronze` view. Returns the record count."""
         if isinstance(bronze_data, pa.Table):
-            data_list = bronze_data.to_pylist()
+            if bronze_data.num_rows == 0:
+                return 0
+            # Zero-copy column selection - missing columns become nulls
+            present = frozenset(bronze_data.column_names)
+            bronze_table = bronze_data.select([col for col in SILVER_COLUMNS if col in present])
+            missing = [col for col in SILVER_COLUMNS if col not in present]
+            if missing:
+                for col in missing:
+                    bronze_table = bronze_table.append_column(col, pa.nulls(bronze_table.num_rows))
+                bronze_table = bronze_table.select(SILVER_COLUMNS)
         else:
-            data_list = bronze_data
+            if not bronze_data:
+                return 0
+            # Build the Silver columns directly - missing keys become nulls
+            bronze_table = pa.Table.from_pydict(
+                {col: [row.get(col) for row in bronze_data] for col in SILVER_COLUMNS}
+            )
         
-        if not data_list:
+        # One cast for every text column; coordinates keep their type for TRY_CAST
+        bronze_table = bronze_table.cast(pa.schema([
+            pa.field(field.name, pa.string()) if field.name in TEXT_COLUMNS else field
+            for field in bronze_table.schema
+        ]))
+        self.conn.register("bronze", bronze_table)
+        return bronze_table.num_rows
+    
+    def transform_bronze_to_silver(self, bronze_data: pa.Table | list[dict]) -> pa.Table:
+        """Transform Bronze data to Silver."""
+        record_count = self._register_bronze(bronze_data)
+        if not record_count:
             # Return empty table with schema
             return pa.Table.from_pylist([], schema=SILVER_SCHEMA)
         
-        record_count = len(data_list)
         logger.info(f"Starting DuckDB transformation with {record_count} records")
         
-        # Normalize data - ensure all expected columns exist
-        normalized = []
-        for row in data_list:
-            norm_row = {}
-            for col in SILVER_COLUMNS:
-                norm_row[col] = row.get(col)
-            normalized.append(norm_row)
+        result = self.conn.execute(
+            f"{SILVER_TRANSFORM_SQL} SELECT * FROM deduplicated ORDER BY id"
+        ).fetch_arrow_table().cast(SILVER_SCHEMA)
         
-        bronze_table = pa.Table.from_pylist(normalized)
-        self.conn.register("bronze", bronze_table)
-        
-        transform_sql = """
-        WITH cleaned AS (
-            SELECT
-                id,
-                TRIM(name) as name,
-                TRIM(LOWER(brewery_type)) as brewery_type,
-                TRIM(address_1) as address_1,
-                TRIM(address_2) as address_2,
-                TRIM(address_3) as address_3,
-                TRIM(city) as city,
-                TRIM(state_province) as state_province,
-                TRIM(postal_code) as postal_code,
-                TRIM(country) as country,
-                TRY_CAST(longitude AS DOUBLE) as longitude,
-                TRY_CAST(latitude AS DOUBLE) as latitude,
-                TRIM(phone) as phone,
-                TRIM(website_url) as website_url
-            FROM bronze
-            WHERE id IS NOT NULL
-        ),
-        validated AS (
-            SELECT
-                id, name, brewery_type, address_1, address_2, address_3,
-                city, state_province, postal_code, country,
-                CASE WHEN longitude < -180 OR longitude > 180 THEN NULL ELSE longitude END as longitude,
-                CASE WHEN latitude < -90 OR latitude > 90 THEN NULL ELSE latitude END as latitude,
-                phone, website_url
-            FROM cleaned
-        ),
-        deduplicated AS (
-            SELECT DISTINCT ON (id)
-                id, name, brewery_type, address_1, address_2, address_3, city,
-                COALESCE(NULLIF(TRIM(state_province), ''), 'Unknown') as state_province,
-                postal_code,
-                COALESCE(NULLIF(TRIM(country), ''), 'Unknown') as country,
-                longitude, latitude, phone, website_url
-            FROM validated
-            ORDER BY id
-        )
-        SELECT * FROM deduplicated
-        """
+        # brewery_type is dictionary-encoded: check the distinct values, not the rows
+        if logger.isEnabledFor(logging.WARNING):
+            _warn_unknown_types({
+                value
+                for chunk in result.column("brewery_type").chunks
+                for value in chunk.dictionary.to_pylist()
+            })
         
-        result = self.conn.execute(transform_sql).fetch_arrow_table()
         logger.info(f"DuckDB transformation complete: {result.num_rows} records")
         return result
     
-    def get_transformation_summary(self, bronze_table: pa.Table, silver_table: pa.Table) -> dict:
-        """Generate transformation summary."""
-        if silver_table.num_rows == 0:
+    def transform_and_write(
+        self,
+        bronze_data: pa.Table | list[dict],
+        silver_dir: str | Path,
+        partition_cols: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Transform Bronze data and write partitioned Parquet straight from DuckDB.
+        
+        The result never leaves DuckDB: COPY fans the rows out to
+        hive-style partition directories with its parallel Parquet writer.
+        Files get unique names, so writing into an existing directory adds data.
+        
+        Unlike transform_bronze_to_silver, the result is not cast to SILVER_SCHEMA:
+        DuckDB has no dictionary type, so brewery_type is stored as plain string.
+        
+        Returns:
+            Number of records written
+        """
+        partition_cols = partition_cols or ["country", "state_province"]
+        
+        record_count = self._register_bronze(bronze_data)
+        if not record_count:
+            return 0
+        
+        logger.info(f"Starting DuckDB transformation with {record_count} records")
+        
+        # Same check as transform_bronze_to_silver, on the distinct cleaned Bronze values
+        if logger.isEnabledFor(logging.WARNING):
+            _warn_unknown_types({
+                value for (value,) in self.conn.execute("""
+                    SELECT DISTINCT TRIM(LOWER(brewery_type)) FROM bronze
+                    WHERE id IS NOT NULL AND brewery_type IS NOT NULL
+                """).fetchall()
+            })
+        
+        cols_sql = ", ".join(f'"{col}"' for col in partition_cols)
+        target = str(silver_dir).replace("'", "''")
+        row = self.conn.execute(f"""
+            COPY ({SILVER_TRANSFORM_SQL} SELECT * FROM deduplicated)
+            TO '{target}' (
+                FORMAT PARQUET, PARTITION_BY ({cols_sql}), OVERWRITE_OR_IGNORE 1,
+                COMPRESSION ZSTD, ROW_GROUP_SIZE 1000000, FILENAME_PATTERN 'part_{{uuid}}'
+            )
+        """).fetchone()
+        assert row is not None
+        written = row[0]
+        
+        logger.info(f"DuckDB transformation complete: {written} records written to {silver_dir}")
+        return written
+    
+    def get_transformation_summary(
+        self, bronze_table: pa.Table, silver_table: pa.Table | ds.Dataset
+    ) -> dict:
+        """Generate transformation summary (Silver may be a table or a Parquet dataset)."""
+        if isinstance(silver_table, pa.Table):
+            silver_count = silver_table.num_rows
+        else:
+            silver_count = silver_table.count_rows()
+        
+        if silver_count == 0:
             return {
                 "bronze_record_count": bronze_table.num_rows,
                 "silver_record_count": 0,
@@ -124,31 +204,52 @@ class DuckDBTransformer:
                 "unique_types": 0,
             }
         
-        self.conn.register("silver_summary", silver_table)
-        stats = self.conn.execute("""
+        return {
+            "bronze_record_count": bronze_table.num_rows,
+            "silver_record_count": silver_count,
+            "records_removed": bronze_table.num_rows - silver_count,
+            **self._silver_stats(silver_table),
+        }
+    
+    def _silver_stats(self, silver_table: pa.Table | ds.Dataset) -> dict:
+        """Distinct counts and per-column null counts in one scan, memoized for the last table seen."""
+        if self._stats_cache is not None and self._stats_cache[0] is silver_table:
+            return self._stats_cache[1]
+        
+        columns = [col for col in SILVER_COLUMNS if col in silver_table.schema.names]
+        null_sql = ", ".join(f'COUNT(*) - COUNT("{col}")' for col in columns)
+        
+        self.attach(silver_table)
+        row = self.conn.execute(f"""
             SELECT 
                 COUNT(DISTINCT country) as unique_countries,
                 COUNT(DISTINCT state_province) as unique_states,
-                COUNT(DISTINCT brewery_type) as unique_types
-            FROM silver_summary
+                COUNT(DISTINCT brewery_type) as unique_types,
+                {null_sql}
+            FROM silver
         """).fetchone()
         
-        return {
-            "bronze_record_count": bronze_table.num_rows,
-            "silver_record_count": silver_table.num_rows,
-            "records_removed": bronze_table.num_rows - silver_table.num_rows,
-            "null_counts": {},
-            "unique_countries": stats[0],
-            "unique_states": stats[1],
-            "unique_types": stats[2],
+        stats = {
+            "null_counts": dict(zip(columns, row[3:])),
+            "unique_countries": row[0],
+            "unique_states": row[1],
+            "unique_types": row[2],
         }
+        self._stats_cache = (silver_table, stats)
+        return stats
     
     def close(self):
         self.conn.close()
 
 
 # Convenience functions
-def transform_bronze_to_silver(data: pa.Table | list[dict]) -> pa.Table:
+def transform_bronze_to_silver(
+    data: pa.Table | list[dict],
+    transformer: Optional[DuckDBTransformer] = None,
+) -> pa.Table:
+    # A caller-supplied transformer is reused and left open
+    if transformer is not None:
+        return transformer.transform_bronze_to_silver(data)
     transformer = DuckDBTransformer()
     try:
         return transformer.transform_bronze_to_silver(data)
@@ -156,7 +257,13 @@ def transform_bronze_to_silver(data: pa.Table | list[dict]) -> pa.Table:
         transformer.close()
 
 
-def get_transformation_summary(bronze_table: pa.Table, silver_table: pa.Table) -> dict:
+def get_transformation_summary(
+    bronze_table: pa.Table,
+    silver_table: pa.Table | ds.Dataset,
+    transformer: Optional[DuckDBTransformer] = None,
+) -> dict:
+    if transformer is not None:
+        return transformer.get_transformation_summary(bronze_table, silver_table)
     transformer = DuckDBTransformer()
     try:
         return transformer.get_transformation_summary(bronze_table, silver_table)
@@ -165,8 +272,8 @@ def get_transformation_summary(bronze_table: pa.Table, silver_table: pa.Table) -
 
 
 # Helper functions
-def arrow_table_from_pylist(data: list[dict]) -> pa.Table:
-    return pa.Table.from_pylist(data)
+def arrow_table_from_pylist(data: list[dict], schema: Optional[pa.Schema] = None) -> pa.Table:
+    return pa.Table.from_pylist(data, schema=schema)
 
 def arrow_table_to_pylist(table: pa.Table) -> list[dict]:
     return table.to_pylist()
@@ -0,0 +1,133 @@
+"""Unit tests for the Bronze reader Arrow path."""
+
+import pyarrow as pa
+import pytest
+
+from src.io.bronze_reader import BronzeReader
+from src.io.raw_writer import RawJsonlGzWriter
+
+INGESTION_DATE = "2025-01-08"
+RUN_ID = "20250108_120000"
+
+
+@pytest.fixture
+def writer(tmp_path):
+    """Create a writer for a single fixed run."""
+    return RawJsonlGzWriter(
+        base_dir=tmp_path, ingestion_date=INGESTION_DATE, run_id=RUN_ID, compresslevel=1
+    )
+
+
+@pytest.fixture
+def reader(writer):
+    """Create a reader over the writer's Bronze root."""
+    return BronzeReader(base_dir=str(writer.base_dir))
+
+
+class TestReadPageAsArrow:
+    """Tests for parsing a single page."""
+
+    def test_empty_page_returns_none(self, writer, reader):
+        """Test a page without records is skipped."""
+        path = writer.write_page(page=1, records=[])
+        assert reader._read_page_as_arrow(path) is None
+
+    def test_all_null_column_stays_string(self, writer, reader):
+        """Test an all-null Silver text column is not inferred as null type."""
+        path = writer.write_page(page=1, records=[
+            {"id": "1", "name": "A", "phone": None},
+            {"id": "2", "name": "B", "phone": None},
+        ])
+        table = reader._read_page_as_arrow(path)
+
+        assert table.schema.field("phone").type == pa.string()
+        assert table.column("phone").null_count == 2
+
+    def test_numeric_postal_code_read_as_string(self, writer, reader):
+        """Test a JSON number in a Silver text column is read and cast to string."""
+        path = writer.write_page(page=1, records=[
+            {"id": "1", "postal_code": 97201},
+            {"id": "2", "postal_code": 94107},
+        ])
+        table = reader._read_page_as_arrow(path)
+
+        assert table.schema.field("postal_code").type == pa.string()
+        assert table.column("postal_code").to_pylist() == ["97201", "94107"]
+
+    def test_metadata_columns_are_strings(self, writer, reader):
+        """Test the ingestion metadata columns are read as text."""
+        path = writer.write_page(page=1, records=[{"id": "1"}])
+        table = reader._read_page_as_arrow(path)
+
+        for name in ("_ingestion_date", "_run_id", "_ingested_at"):
+            assert table.schema.field(name).type == pa.string()
+
+
+class TestReadRunAsArrow:
+    """Tests for reading a whole run into one table."""
+
+    def test_multi_page_keeps_page_order(self, writer, reader):
+        """Test pages are concatenated in page-number order."""
+        for page in range(1, 13):
+            writer.write_page(page=page, records=[{"id": f"{page:02d}-{i}"} for i in range(3)])
+
+        table = reader.read_run_as_arrow(INGESTION_DATE, RUN_ID)
+
+        expected = [f"{page:02d}-{i}" for page in range(1, 13) for i in range(3)]
+        assert table.column("id").to_pylist() == expected
+
+    def test_null_page_concats_with_string_page(self, writer, reader):
+        """Test a page with a null-only column concatenates with a populated one."""
+        writer.write_page(page=1, records=[{"id": "1", "website_url": None}])
+        writer.write_page(page=2, records=[{"id": "2", "website_url": "http://b.com"}])
+
+        table = reader.read_run_as_arrow(INGESTION_DATE, RUN_ID)
+
+        assert table.schema.field("website_url").type == pa.string()
+        assert table.column("website_url").to_pylist() == [None, "http://b.com"]
+
+    def test_numeric_and_string_pages_concat(self, writer, reader):
+        """Test a numeric postal_code page concatenates with a string one."""
+        writer.write_page(page=1, records=[{"id": "1", "postal_code": 97201}])
+        writer.write_page(page=2, records=[{"id": "2", "postal_code": "97201-1234"}])
+
+        table = reader.read_run_as_arrow(INGESTION_DATE, RUN_ID)
+
+        assert table.column("postal_code").to_pylist() == ["97201", "97201-1234"]
+
+    def test_empty_pages_skipped(self, writer, reader):
+        """Test empty pages in a run do not contribute rows."""
+        writer.write_page(page=1, records=[{"id": "1"}])
+        writer.write_page(page=2, records=[])
+
+        table = reader.read_run_as_arrow(INGESTION_DATE, RUN_ID)
+
+        assert table.num_rows == 1
+
+    def test_round_trip_matches_list_reader(self, writer, reader):
+        """Test the writer's output reads back the same through both readers."""
+        records = [
+            {"id": "1", "name": "Brew Ü", "city": "Bend", "longitude": "-121.3", "updated_at": "2024-01-01T00:00:00.000Z"},
+            {"id": "2", "name": "Brew 2", "city": None, "longitude": None, "updated_at": "2024-02-01T00:00:00.000Z"},
+        ]
+        writer.write_page(page=1, records=records[:1])
+        writer.write_page(page=2, records=records[1:])
+
+        latest = reader.read_latest_run_as_arrow()
+        by_id = reader.read_run_as_arrow(INGESTION_DATE, RUN_ID)
+
+        assert latest.equals(by_id)
+        assert latest.column("id").to_pylist() == ["1", "2"]
+        assert latest.column("name").to_pylist() == ["Brew Ü", "Brew 2"]
+        assert latest.column("city").to_pylist() == ["Bend", None]
+        assert latest.column("_run_id").to_pylist() == [RUN_ID, RUN_ID]
+        assert latest.num_rows == len(reader.read_latest_run_as_list())
+
+    def test_missing_run_raises(self, reader):
+        """Test reading an unknown run raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            reader.read_run_as_arrow(INGESTION_DATE, "missing")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
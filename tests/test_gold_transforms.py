@@ -1,9 +1,15 @@
 """Unit tests for Gold layer transformations (DuckDB + PyArrow)."""
 
+import functools
+
+import duckdb
 import pytest
 import pyarrow as pa
+import pyarrow.compute as pc
 
+from src.transforms import gold_transforms
 from src.transforms.gold_transforms import (
+    SMALL_INPUT_THRESHOLD,
     DuckDBAggregator,
     aggregate_by_type_and_location,
     aggregate_by_type,
@@ -14,148 +20,300 @@ from src.transforms.gold_transforms import (
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_silver_table():
     """Create sample Silver layer data as PyArrow Table."""
-    data = [
-        {"id": "1", "name": "Brewery A", "brewery_type": "micro", "country": "United States", "state_province": "California"},
-        {"id": "2", "name": "Brewery B", "brewery_type": "micro", "country": "United States", "state_province": "California"},
-        {"id": "3", "name": "Brewery C", "brewery_type": "brewpub", "country": "United States", "state_province": "California"},
-        {"id": "4", "name": "Brewery D", "brewery_type": "micro", "country": "United States", "state_province": "Oregon"},
-        {"id": "5", "name": "Brewery E", "brewery_type": "nano", "country": "United States", "state_province": "Oregon"},
-        {"id": "6", "name": "Brewery F", "brewery_type": "micro", "country": "Ireland", "state_province": "Dublin"},
-        {"id": "7", "name": "Brewery G", "brewery_type": "brewpub", "country": "Ireland", "state_province": "Dublin"},
-    ]
-    return pa.Table.from_pylist(data)
+    category = pa.dictionary(pa.int8(), pa.string())
+    return pa.Table.from_arrays(
+        [
+            pa.array(["1", "2", "3", "4", "5", "6", "7"], type=pa.string()),
+            pa.array([f"Brewery {c}" for c in "ABCDEFG"], type=pa.string()),
+            pa.array(
+                ["micro", "micro", "brewpub", "micro", "nano", "micro", "brewpub"]
+            ).dictionary_encode().cast(category),
+            pa.array(
+                ["United States"] * 5 + ["Ireland"] * 2
+            ).dictionary_encode().cast(category),
+            pa.array(
+                ["California"] * 3 + ["Oregon"] * 2 + ["Dublin"] * 2
+            ).dictionary_encode().cast(category),
+        ],
+        names=["id", "name", "brewery_type", "country", "state_province"],
+    )
+
+
+@pytest.fixture(scope="module")
+def empty_silver_table(sample_silver_table):
+    """Zero-row Silver table with the same schema as the sample data."""
+    return sample_silver_table.schema.empty_table()
+
+
+@pytest.fixture(scope="module")
+def duck_conn():
+    """Single in-memory DuckDB connection shared by the module's tests."""
+    conn = duckdb.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def aggregator(sample_silver_table, duck_conn):
+    """One aggregator with the sample table bound as the `silver` view."""
+    agg = DuckDBAggregator(duck_conn, table=sample_silver_table)
+    yield agg
+    agg.close()
+
+
+@pytest.fixture(scope="module")
+def all_aggs(sample_silver_table, aggregator):
+    """Run every default aggregation once over a single registration."""
+    return {
+        "by_type_loc": aggregator.aggregate_by_type_and_location(sample_silver_table),
+        "by_type": aggregator.aggregate_by_type(sample_silver_table),
+        "by_country": aggregator.aggregate_by_country(sample_silver_table),
+        "by_state": aggregator.aggregate_by_state(sample_silver_table),
+        "summary": aggregator.create_gold_summary(sample_silver_table),
+    }
+
+
+@pytest.fixture(scope="module")
+def expected_aggs():
+    """Expected default aggregations of sample_silver_table."""
+    count = ("brewery_count", pa.int64())
+    return {
+        "by_type_loc": pa.table(
+            {
+                "country": ["United States"] * 4 + ["Ireland"] * 2,
+                "state_province": ["California", "California", "Oregon", "Oregon", "Dublin", "Dublin"],
+                "brewery_type": ["micro", "brewpub", "micro", "nano", "micro", "brewpub"],
+                "brewery_count": [2, 1, 1, 1, 1, 1],
+            },
+            schema=pa.schema([("country", pa.string()), ("state_province", pa.string()), ("brewery_type", pa.string()), count]),
+        ),
+        "by_type": pa.table(
+            {"brewery_type": ["micro", "brewpub", "nano"], "brewery_count": [4, 2, 1]},
+            schema=pa.schema([("brewery_type", pa.string()), count]),
+        ),
+        "by_country": pa.table(
+            {"country": ["United States", "Ireland"], "brewery_count": [5, 2]},
+            schema=pa.schema([("country", pa.string()), count]),
+        ),
+        "by_state": pa.table(
+            {
+                "country": ["United States", "United States", "Ireland"],
+                "state_province": ["California", "Oregon", "Dublin"],
+                "brewery_count": [3, 2, 2],
+            },
+            schema=pa.schema([("country", pa.string()), ("state_province", pa.string()), count]),
+        ),
+    }
+
+
+def _sorted(table: pa.Table) -> pa.Table:
+    """Sort by every column so tables compare independently of row order."""
+    return table.sort_by([(col, "ascending") for col in table.column_names])
+
+
+@pytest.fixture(scope="module")
+def gold_type_location(all_aggs):
+    """Gold table at the default country/state/type grain."""
+    return all_aggs["by_type_loc"]
 
 
 class TestAggregateByTypeAndLocation:
     """Tests for aggregate_by_type_and_location."""
     
-    def test_aggregates_correctly(self, sample_silver_table):
+    def test_aggregates_correctly(self, gold_type_location, expected_aggs):
         """Test aggregation produces correct counts."""
-        result = aggregate_by_type_and_location(sample_silver_table)
+        result = gold_type_location
         
         assert isinstance(result, pa.Table)
-        assert "country" in result.column_names
-        assert "state_province" in result.column_names
-        assert "brewery_type" in result.column_names
-        assert "brewery_count" in result.column_names
+        assert _sorted(result).equals(_sorted(expected_aggs["by_type_loc"]))
     
-    def test_total_matches_input(self, sample_silver_table):
+    def test_total_matches_input(self, gold_type_location):
         """Test total count matches input."""
-        result = aggregate_by_type_and_location(sample_silver_table)
-        total = sum(result.column("brewery_count").to_pylist())
-        assert total == 7
+        result = gold_type_location
+        assert pc.sum(result.column("brewery_count")).as_py() == 7
     
-    def test_custom_group_columns(self, sample_silver_table):
+    def test_custom_group_columns(self, sample_silver_table, duck_conn):
         """Test custom grouping columns."""
-        result = aggregate_by_type_and_location(sample_silver_table, group_cols=["country", "brewery_type"])
+        result = aggregate_by_type_and_location(sample_silver_table, group_cols=["country", "brewery_type"], conn=duck_conn)
         
         assert "country" in result.column_names
         assert "brewery_type" in result.column_names
         assert "state_province" not in result.column_names
+
+
+class TestAttach:
+    """Tests for DuckDBAggregator.attach."""
+    
+    def test_table_bound_at_construction(self, sample_silver_table):
+        """Test a table passed to the constructor is registered as `silver`."""
+        # Own connection, so no other test can replace the view
+        agg = DuckDBAggregator(table=sample_silver_table)
+        try:
+            assert agg._attached is sample_silver_table
+            assert agg.conn.execute("SELECT COUNT(*) FROM silver").fetchone() == (7,)
+        finally:
+            agg.close()
+    
+    def test_shared_registration_across_methods(self, sample_silver_table, duck_conn):
+        """Test one attached table serves every aggregation."""
+        agg = DuckDBAggregator(duck_conn, small_input_threshold=0)
+        try:
+            agg.attach(sample_silver_table)
+            by_type = agg.aggregate_by_type(sample_silver_table)
+            by_country = agg.aggregate_by_country(sample_silver_table)
+            assert pc.sum(by_type.column("brewery_count")).as_py() == 7
+            assert pc.sum(by_country.column("brewery_count")).as_py() == 7
+        finally:
+            agg.close()
     
-    def test_california_micro_count(self, sample_silver_table):
-        """Test specific aggregation value."""
-        result = aggregate_by_type_and_location(sample_silver_table)
-        data = result.to_pylist()
+    def test_aggregators_sharing_connection_keep_own_data(self, duck_conn):
+        """Test two aggregators on one connection never read each other's table."""
+        x = pa.table({"country": ["A", "A", "A"], "state_province": ["S", "S", "S"], "brewery_type": ["micro"] * 3})
+        y = pa.table({"country": ["B"] * 5, "state_province": ["T"] * 5, "brewery_type": ["nano"] * 5})
+        a = DuckDBAggregator(duck_conn, small_input_threshold=0, table=x)
+        DuckDBAggregator(duck_conn, small_input_threshold=0, table=y)
         
-        ca_micro = [r for r in data if r["country"] == "United States" 
-                    and r["state_province"] == "California" 
-                    and r["brewery_type"] == "micro"]
+        assert a.aggregate_by_country(x).to_pylist() == [{"country": "A", "brewery_count": 3}]
+        assert a.create_gold_summary(x)["total_breweries"] == 3
+    
+    def test_injected_connection_left_open(self, sample_silver_table, duck_conn):
+        """Test close() leaves a caller-owned connection open."""
+        agg = DuckDBAggregator(duck_conn)
+        agg.aggregate_by_type(sample_silver_table)
+        agg.close()
+        assert duck_conn.execute("SELECT 1").fetchone() == (1,)
+
+
+class TestConvenienceFunctions:
+    """Tests for the module-level wrappers."""
+    
+    def test_wrappers_match_aggregator(self, sample_silver_table, duck_conn, all_aggs):
+        """Test each wrapper returns the same result as the aggregator method."""
+        assert aggregate_by_type(sample_silver_table, conn=duck_conn).equals(all_aggs["by_type"])
+        assert aggregate_by_country(sample_silver_table, conn=duck_conn).equals(all_aggs["by_country"])
+        assert create_gold_summary(sample_silver_table, conn=duck_conn) == all_aggs["summary"]
+
+
+class TestSmallInputFastPath:
+    """Tests for the Arrow group-by path used below SMALL_INPUT_THRESHOLD."""
+    
+    @pytest.mark.parametrize("method, kwargs", [
+        ("aggregate_by_type_and_location", {}),
+        ("aggregate_by_type", {}),
+        ("aggregate_by_country", {}),
+        ("aggregate_by_state", {}),
+        ("aggregate_by_state", {"country": "United States"}),
+    ])
+    def test_matches_duckdb(self, sample_silver_table, duck_conn, method, kwargs):
+        """Test the Arrow path returns the same rows and schema as DuckDB."""
+        fast = DuckDBAggregator(duck_conn)
+        slow = DuckDBAggregator(duck_conn, small_input_threshold=0)
+        
+        fast_result = getattr(fast, method)(sample_silver_table, **kwargs)
+        slow_result = getattr(slow, method)(sample_silver_table, **kwargs)
+        
+        assert fast_result.schema == slow_result.schema
+        assert _sorted(fast_result).equals(_sorted(slow_result))
+    
+    def test_default_uses_duckdb_above_threshold(self, sample_silver_table, duck_conn, expected_aggs, monkeypatch):
+        """Test a table past the default threshold is aggregated by DuckDB with the same results."""
+        copies = SMALL_INPUT_THRESHOLD // sample_silver_table.num_rows + 1
+        large = pa.concat_tables([sample_silver_table] * copies)
+        
+        def _fail(*args, **kwargs):
+            raise AssertionError("Arrow fast path used above the threshold")
+        
+        monkeypatch.setattr(gold_transforms, "_group_count_arrow", _fail)
+        agg = DuckDBAggregator(duck_conn)
+        
+        result = agg.aggregate_by_type_and_location(large)
+        expected = expected_aggs["by_type_loc"]
+        expected = expected.set_column(3, "brewery_count", pc.multiply(expected["brewery_count"], copies))
         
-        assert len(ca_micro) == 1
-        assert ca_micro[0]["brewery_count"] == 2
+        assert large.num_rows >= SMALL_INPUT_THRESHOLD
+        assert _sorted(result).equals(_sorted(expected))
+        assert agg.aggregate_by_country(large).column("brewery_count").to_pylist() == [5 * copies, 2 * copies]
 
 
 class TestAggregateByType:
     """Tests for aggregate_by_type."""
     
-    def test_aggregates_by_type(self, sample_silver_table):
+    def test_aggregates_by_type(self, all_aggs, expected_aggs):
         """Test aggregation by type."""
-        result = aggregate_by_type(sample_silver_table)
+        result = all_aggs["by_type"]
         
         assert isinstance(result, pa.Table)
-        assert "brewery_type" in result.column_names
-        assert "brewery_count" in result.column_names
-    
-    def test_micro_count(self, sample_silver_table):
-        """Test micro brewery count."""
-        result = aggregate_by_type(sample_silver_table)
-        data = result.to_pylist()
-        
-        micro = [r for r in data if r["brewery_type"] == "micro"]
-        assert micro[0]["brewery_count"] == 4
+        assert _sorted(result).equals(_sorted(expected_aggs["by_type"]))
     
-    def test_sorted_descending(self, sample_silver_table):
+    def test_sorted_descending(self, all_aggs):
         """Test results are sorted by count descending."""
-        result = aggregate_by_type(sample_silver_table)
-        counts = result.column("brewery_count").to_pylist()
+        result = all_aggs["by_type"]
+        counts = result.column("brewery_count")
         
-        assert counts == sorted(counts, reverse=True)
+        assert pc.all(pc.greater_equal(counts[:-1], counts[1:])).as_py()
 
 
 class TestAggregateByCountry:
     """Tests for aggregate_by_country."""
     
-    def test_aggregates_by_country(self, sample_silver_table):
+    def test_aggregates_by_country(self, all_aggs, expected_aggs):
         """Test aggregation by country."""
-        result = aggregate_by_country(sample_silver_table)
+        result = all_aggs["by_country"]
         
         assert isinstance(result, pa.Table)
-        assert "country" in result.column_names
-        assert "brewery_count" in result.column_names
-    
-    def test_us_count(self, sample_silver_table):
-        """Test US brewery count."""
-        result = aggregate_by_country(sample_silver_table)
-        data = result.to_pylist()
-        
-        us = [r for r in data if r["country"] == "United States"]
-        assert us[0]["brewery_count"] == 5
+        assert _sorted(result).equals(_sorted(expected_aggs["by_country"]))
+
+
+class TestGroupCounts:
+    """Table-driven checks of individual group counts."""
     
-    def test_ireland_count(self, sample_silver_table):
-        """Test Ireland brewery count."""
-        result = aggregate_by_country(sample_silver_table)
-        data = result.to_pylist()
+    @pytest.mark.parametrize("agg_key, keys, expected", [
+        ("by_type_loc", {"country": "United States", "state_province": "California", "brewery_type": "micro"}, 2),
+        ("by_type", {"brewery_type": "micro"}, 4),
+        ("by_country", {"country": "United States"}, 5),
+        ("by_country", {"country": "Ireland"}, 2),
+    ], ids=["california_micro", "micro", "us", "ireland"])
+    def test_group_count(self, all_aggs, agg_key, keys, expected):
+        """Test a single group has the expected brewery count."""
+        result = all_aggs[agg_key]
+        mask = functools.reduce(pc.and_, [pc.equal(result[col], value) for col, value in keys.items()])
+        group = result.filter(mask)
         
-        ireland = [r for r in data if r["country"] == "Ireland"]
-        assert ireland[0]["brewery_count"] == 2
+        assert group.num_rows == 1
+        assert group["brewery_count"][0].as_py() == expected
 
 
 class TestAggregateByState:
     """Tests for aggregate_by_state."""
     
-    def test_aggregates_by_state(self, sample_silver_table):
+    def test_aggregates_by_state(self, all_aggs, expected_aggs):
         """Test aggregation by state."""
-        result = aggregate_by_state(sample_silver_table)
+        result = all_aggs["by_state"]
         
         assert isinstance(result, pa.Table)
-        assert "country" in result.column_names
-        assert "state_province" in result.column_names
-        assert "brewery_count" in result.column_names
+        assert _sorted(result).equals(_sorted(expected_aggs["by_state"]))
     
-    def test_filter_by_country(self, sample_silver_table):
-        """Test filtering by country."""
-        result = aggregate_by_state(sample_silver_table, country="United States")
-        data = result.to_pylist()
+    @pytest.mark.parametrize("country, expected_states", [
+        ("United States", 2),  # California and Oregon
+        ("Brazil", 0),
+    ])
+    def test_filter_by_country(self, sample_silver_table, duck_conn, country, expected_states):
+        """Test filtering by country, including a country with no breweries."""
+        result = aggregate_by_state(sample_silver_table, country=country, conn=duck_conn)
         
-        assert all(r["country"] == "United States" for r in data)
-        assert len(data) == 2  # California and Oregon
-    
-    def test_nonexistent_country(self, sample_silver_table):
-        """Test filtering by non-existent country."""
-        result = aggregate_by_state(sample_silver_table, country="Brazil")
-        assert result.num_rows == 0
+        assert pc.all(pc.equal(result["country"], country), min_count=0).as_py()
+        assert result.num_rows == expected_states
 
 
 class TestGoldSummary:
     """Tests for create_gold_summary."""
     
-    def test_summary_keys(self, sample_silver_table):
+    def test_summary_keys(self, all_aggs):
         """Test summary contains expected keys."""
-        result = create_gold_summary(sample_silver_table)
+        result = all_aggs["summary"]
         
         assert "total_breweries" in result
         assert "total_countries" in result
@@ -164,9 +322,9 @@ class TestGoldSummary:
         assert "by_type" in result
         assert "by_country" in result
     
-    def test_summary_values(self, sample_silver_table):
+    def test_summary_values(self, all_aggs):
         """Test summary values are correct."""
-        result = create_gold_summary(sample_silver_table)
+        result = all_aggs["summary"]
         
         assert result["total_breweries"] == 7
         assert result["total_countries"] == 2
@@ -177,10 +335,9 @@ class TestGoldSummary:
 class TestAggregationStats:
     """Tests for get_aggregation_stats."""
     
-    def test_stats_keys(self, sample_silver_table):
+    def test_stats_keys(self, gold_type_location, duck_conn):
         """Test stats contain expected keys."""
-        gold = aggregate_by_type_and_location(sample_silver_table)
-        stats = get_aggregation_stats(gold)
+        stats = get_aggregation_stats(gold_type_location, conn=duck_conn)
         
         assert "total_rows" in stats
         assert "total_breweries" in stats
@@ -189,10 +346,9 @@ class TestAggregationStats:
         assert "max_breweries_in_group" in stats
         assert "min_breweries_in_group" in stats
     
-    def test_stats_values(self, sample_silver_table):
+    def test_stats_values(self, gold_type_location, duck_conn):
         """Test stats values are correct."""
-        gold = aggregate_by_type_and_location(sample_silver_table)
-        stats = get_aggregation_stats(gold)
+        stats = get_aggregation_stats(gold_type_location, conn=duck_conn)
         
         assert stats["total_breweries"] == 7
         assert stats["unique_countries"] == 2
@@ -201,11 +357,11 @@ class TestAggregationStats:
 class TestEmptyData:
     """Tests for empty data handling."""
     
-    def test_empty_table(self):
+    def test_empty_table(self, empty_silver_table, duck_conn):
         """Test aggregation with empty table."""
-        empty = pa.Table.from_pylist([])
-        result = aggregate_by_type_and_location(empty)
+        result = aggregate_by_type_and_location(empty_silver_table, conn=duck_conn)
         assert result.num_rows == 0
+        assert result.column_names == ["country", "state_province", "brewery_type", "brewery_count"]
 
 
 if __name__ == "__main__":
@@ -3,21 +3,55 @@ Unit tests for RawJsonlGzWriter.
 """
 
 import gzip
-import json
-import pytest
 from pathlib import Path
 from unittest.mock import patch
 
+import orjson
+import pytest
+from freezegun import freeze_time
+
 from src.io.raw_writer import RawJsonlGzWriter
 
 
+def _read_json_gz(path: Path) -> list:
+    """Read every record from a gzipped JSONL page."""
+    return [orjson.loads(line) for line in gzip.decompress(path.read_bytes()).splitlines() if line]
+
+
+def _read_json(path: Path) -> dict:
+    """Read a JSON document."""
+    return orjson.loads(path.read_bytes())
+
+
+@pytest.fixture(scope="class")
+def bronze_root(tmp_path_factory):
+    """Create one temporary bronze directory for the whole class."""
+    return tmp_path_factory.mktemp("bronze")
+
+
+@pytest.fixture(scope="class")
+def sample_records():
+    """Sample brewery records for testing."""
+    return [
+        {"id": "1", "name": "Brewery A", "city": "Portland"},
+        {"id": "2", "name": "Brewery B", "city": "Seattle"},
+        {"id": "3", "name": "Brewery C", "city": "Denver"}
+    ]
+
+
+@pytest.fixture(scope="class")
+def sample_records_encoded(sample_records):
+    """Sample records pre-serialized as JSONL bytes."""
+    return b"".join(orjson.dumps(r) + b"\n" for r in sample_records)
+
+
 class TestRawJsonlGzWriter:
     """Test suite for RawJsonlGzWriter."""
     
     @pytest.fixture
-    def temp_dir(self, tmp_path):
-        """Create a temporary directory for tests."""
-        return tmp_path / "bronze"
+    def temp_dir(self, bronze_root, request):
+        """Give each test its own subdirectory so written pages never collide."""
+        return bronze_root / request.node.name
     
     @pytest.fixture
     def writer(self, temp_dir):
@@ -25,18 +59,10 @@ class TestRawJsonlGzWriter:
         return RawJsonlGzWriter(
             base_dir=temp_dir,
             ingestion_date="2025-01-08",
-            run_id="20250108_120000"
+            run_id="20250108_120000",
+            compresslevel=1
         )
     
-    @pytest.fixture
-    def sample_records(self):
-        """Sample brewery records for testing."""
-        return [
-            {"id": "1", "name": "Brewery A", "city": "Portland"},
-            {"id": "2", "name": "Brewery B", "city": "Seattle"},
-            {"id": "3", "name": "Brewery C", "city": "Denver"}
-        ]
-    
     def test_init_with_string_path(self, temp_dir):
         """Test that string paths are converted to Path objects."""
         writer = RawJsonlGzWriter(base_dir=str(temp_dir))
@@ -67,13 +93,11 @@ class TestRawJsonlGzWriter:
         """Test that written content is valid JSONL."""
         output_path = writer.write_page(page=1, records=sample_records, add_metadata=False)
         
-        with gzip.open(output_path, "rt", encoding="utf-8") as f:
-            lines = f.readlines()
+        records = _read_json_gz(output_path)
         
-        assert len(lines) == 3
+        assert len(records) == 3
         
-        for line in lines:
-            record = json.loads(line.strip())
+        for record in records:
             assert "id" in record
             assert "name" in record
     
@@ -81,10 +105,7 @@ class TestRawJsonlGzWriter:
         """Test that ingestion metadata is added to records."""
         output_path = writer.write_page(page=1, records=sample_records, add_metadata=True)
         
-        with gzip.open(output_path, "rt", encoding="utf-8") as f:
-            first_line = f.readline()
-        
-        record = json.loads(first_line)
+        record = _read_json_gz(output_path)[0]
         
         assert "_ingestion_date" in record
         assert "_run_id" in record
@@ -92,14 +113,22 @@ class TestRawJsonlGzWriter:
         assert record["_ingestion_date"] == "2025-01-08"
         assert record["_run_id"] == "20250108_120000"
     
+    def test_write_page_metadata_edge_records(self, writer):
+        """Test metadata on empty records and records that already carry it."""
+        records = [{}, {"id": "1", "_run_id": "stale"}]
+        output_path = writer.write_page(page=1, records=records, add_metadata=True)
+        
+        empty, stale = _read_json_gz(output_path)
+        
+        assert set(empty) == {"_ingestion_date", "_run_id", "_ingested_at"}
+        assert stale["_run_id"] == "20250108_120000"
+        assert stale["_ingested_at"] == empty["_ingested_at"]
+    
     def test_write_page_without_metadata(self, writer, sample_records):
         """Test writing without adding metadata."""
         output_path = writer.write_page(page=1, records=sample_records, add_metadata=False)
         
-        with gzip.open(output_path, "rt", encoding="utf-8") as f:
-            first_line = f.readline()
-        
-        record = json.loads(first_line)
+        record = _read_json_gz(output_path)[0]
         
         assert "_ingestion_date" not in record
         assert "_run_id" not in record
@@ -115,22 +144,28 @@ class TestRawJsonlGzWriter:
         assert writer._written_pages[1]["page"] == 2
         assert writer._written_pages[1]["record_count"] == 2
     
-    def test_write_page_numbering_format(self, writer, sample_records):
-        """Test that page numbers are zero-padded."""
-        writer.write_page(page=1, records=sample_records)
-        writer.write_page(page=99, records=sample_records)
-        writer.write_page(page=100, records=sample_records)
+    def test_write_page_bytes(self, writer, sample_records, sample_records_encoded):
+        """Test that pre-encoded pages round-trip and are tracked."""
+        output_path = writer.write_page_bytes(page=1, data=sample_records_encoded, record_count=3)
         
-        files = list(writer.run_dir.glob("page=*.jsonl.gz"))
-        file_names = [f.name for f in files]
-        
-        assert "page=0001.jsonl.gz" in file_names
-        assert "page=0099.jsonl.gz" in file_names
-        assert "page=0100.jsonl.gz" in file_names
+        assert _read_json_gz(output_path) == sample_records
+        assert writer._written_pages[0]["record_count"] == 3
     
-    def test_write_manifest_creates_file(self, writer, sample_records):
+    def test_write_page_numbering_format(self, writer, sample_records_encoded):
+        """Test that page numbers are zero-padded."""
+        writer.write_page_bytes(page=1, data=sample_records_encoded, record_count=3)
+        writer.write_page_bytes(page=99, data=sample_records_encoded, record_count=3)
+        writer.write_page_bytes(page=100, data=sample_records_encoded, record_count=3)
+        
+        assert writer.written_page_names == [
+            "page=0001.jsonl.gz",
+            "page=0099.jsonl.gz",
+            "page=0100.jsonl.gz",
+        ]
+    
+    def test_write_manifest_creates_file(self, writer, sample_records_encoded):
         """Test that manifest file is created."""
-        writer.write_page(page=1, records=sample_records)
+        writer.write_page_bytes(page=1, data=sample_records_encoded, record_count=3)
         manifest_path = writer.write_manifest()
         
         assert manifest_path.exists()
@@ -142,8 +177,7 @@ class TestRawJsonlGzWriter:
         writer.write_page(page=2, records=sample_records[:1])
         manifest_path = writer.write_manifest()
         
-        with open(manifest_path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
+        manifest = _read_json(manifest_path)
         
         assert manifest["ingestion_date"] == "2025-01-08"
         assert manifest["run_id"] == "20250108_120000"
@@ -159,8 +193,7 @@ class TestRawJsonlGzWriter:
         extra = {"source": "test_api", "version": "1.0"}
         manifest_path = writer.write_manifest(extra_metadata=extra)
         
-        with open(manifest_path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
+        manifest = _read_json(manifest_path)
         
         assert manifest["source"] == "test_api"
         assert manifest["version"] == "1.0"
@@ -180,10 +213,9 @@ class TestRawJsonlGzWriter:
         """Test writing empty records."""
         output_path = writer.write_page(page=1, records=[])
         
-        with gzip.open(output_path, "rt", encoding="utf-8") as f:
-            content = f.read()
+        content = gzip.decompress(output_path.read_bytes())
         
-        assert content == ""
+        assert content == b""
         assert writer._written_pages[0]["record_count"] == 0
     
     def test_unicode_content(self, writer):
@@ -195,11 +227,7 @@ class TestRawJsonlGzWriter:
         
         output_path = writer.write_page(page=1, records=records, add_metadata=False)
         
-        with gzip.open(output_path, "rt", encoding="utf-8") as f:
-            lines = f.readlines()
-        
-        record1 = json.loads(lines[0])
-        record2 = json.loads(lines[1])
+        record1, record2 = _read_json_gz(output_path)
         
         assert record1["name"] == "Cervejaria São Paulo"
         assert record2["name"] == "ブルワリー東京"
@@ -208,26 +236,19 @@ class TestRawJsonlGzWriter:
 class TestRawJsonlGzWriterDefaults:
     """Test default values for RawJsonlGzWriter."""
     
+    @freeze_time("2025-01-08 12:00:00")
     def test_default_ingestion_date_format(self, tmp_path):
-        """Test that default ingestion_date is in correct format."""
+        """Test that default ingestion_date is the current UTC date."""
         writer = RawJsonlGzWriter(base_dir=tmp_path)
         
-        # Should be YYYY-MM-DD format
-        parts = writer.ingestion_date.split("-")
-        assert len(parts) == 3
-        assert len(parts[0]) == 4  # Year
-        assert len(parts[1]) == 2  # Month
-        assert len(parts[2]) == 2  # Day
+        assert writer.ingestion_date == "2025-01-08"
     
+    @freeze_time("2025-01-08 12:00:00")
     def test_default_run_id_format(self, tmp_path):
-        """Test that default run_id is in correct format."""
+        """Test that default run_id is the current UTC timestamp."""
         writer = RawJsonlGzWriter(base_dir=tmp_path)
         
-        # Should be YYYYMMDD_HHMMSS format
-        parts = writer.run_id.split("_")
-        assert len(parts) == 2
-        assert len(parts[0]) == 8  # YYYYMMDD
-        assert len(parts[1]) == 6  # HHMMSS
+        assert writer.run_id == "20250108_120000"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+"""Unit tests for the Silver layer pipeline write paths."""
+
+import json
+
+import pytest
+from deltalake import DeltaTable
+
+from src.io.raw_writer import RawJsonlGzWriter
+from src.pipelines.silver_layer import SilverLayerPipeline
+
+
+@pytest.fixture
+def bronze_dir(tmp_path):
+    """Write one Bronze run with 4 records, 3 of them unique."""
+    writer = RawJsonlGzWriter(base_dir=tmp_path / "bronze", compresslevel=1)
+    writer.write_page(page=1, records=[
+        {"id": "1", "name": "A", "brewery_type": "micro", "country": "United States", "state_province": "Oregon"},
+        {"id": "1", "name": "A", "brewery_type": "micro", "country": "United States", "state_province": "Oregon"},
+        {"id": "2", "name": "B", "brewery_type": "nano", "country": "Ireland", "state_province": "Dublin"},
+        {"id": "3", "name": "C", "brewery_type": "brewpub", "country": "Ireland", "state_province": "Dublin"},
+    ])
+    return writer.base_dir
+
+
+def _pipeline(bronze_dir, silver_dir, output_format="parquet"):
+    return SilverLayerPipeline(
+        bronze_dir=str(bronze_dir), silver_dir=str(silver_dir), output_format=output_format
+    )
+
+
+class TestParquetWrite:
+    """Tests for the DuckDB-written Parquet path."""
+
+    def test_append_summary_counts_only_this_run(self, bronze_dir, tmp_path):
+        """Test an append run reports its own rows, not the whole directory."""
+        silver_dir = tmp_path / "silver"
+        _pipeline(bronze_dir, silver_dir).run(mode="overwrite")
+        summary = _pipeline(bronze_dir, silver_dir).run(mode="append")
+
+        assert summary["bronze_record_count"] == 4
+        assert summary["silver_record_count"] == 3
+        assert summary["records_removed"] == 1
+        assert summary["unique_countries"] == 2
+
+    def test_failed_overwrite_keeps_previous_output(self, bronze_dir, tmp_path, monkeypatch):
+        """Test a transform error during overwrite leaves the old Parquet files in place."""
+        silver_dir = tmp_path / "silver"
+        _pipeline(bronze_dir, silver_dir).run(mode="overwrite")
+        before = sorted(silver_dir.rglob("*.parquet"))
+
+        pipeline = _pipeline(bronze_dir, silver_dir)
+
+        def _fail(*args, **kwargs):
+            raise RuntimeError("COPY failed")
+
+        monkeypatch.setattr(pipeline.transformer, "transform_and_write", _fail)
+        with pytest.raises(RuntimeError, match="COPY failed"):
+            pipeline.run(mode="overwrite")
+
+        assert before and sorted(silver_dir.rglob("*.parquet")) == before
+        assert not list(tmp_path.glob("silver.*"))
+
+    def test_overwrite_replaces_previous_output(self, bronze_dir, tmp_path):
+        """Test a successful overwrite leaves only the new run's files."""
+        silver_dir = tmp_path / "silver"
+        _pipeline(bronze_dir, silver_dir).run(mode="overwrite")
+        before = set(silver_dir.rglob("*.parquet"))
+        summary = _pipeline(bronze_dir, silver_dir).run(mode="overwrite")
+
+        assert summary["silver_record_count"] == 3
+        assert before.isdisjoint(silver_dir.rglob("*.parquet"))
+        assert not list(tmp_path.glob("silver.*"))
+
+    @pytest.mark.parametrize("mode", ["overwrite", "append"])
+    def test_refuses_delta_directory(self, bronze_dir, tmp_path, mode):
+        """Test the Parquet path never writes into an existing Delta table."""
+        silver_dir = tmp_path / "silver"
+        _pipeline(bronze_dir, silver_dir, "delta").run(mode="overwrite")
+
+        with pytest.raises(ValueError, match="holds a Delta table"):
+            _pipeline(bronze_dir, silver_dir).run(mode=mode)
+
+        assert (silver_dir / "_delta_log").is_dir()
+        assert _pipeline(bronze_dir, silver_dir, "delta")._get_delta_info()["num_rows"] == 3
+
+
+class TestWriteMode:
+    """Tests for write mode validation."""
+
+    @pytest.mark.parametrize("output_format", ["delta", "parquet"])
+    def test_unknown_mode_rejected(self, bronze_dir, tmp_path, output_format):
+        """Test modes other than overwrite/append raise instead of appending."""
+        with pytest.raises(ValueError, match="Unsupported write mode"):
+            _pipeline(bronze_dir, tmp_path / "silver", output_format).run(mode="upsert")
+
+
+class TestBronzeTypes:
+    """Tests for Bronze values whose JSON type differs from the Silver type."""
+
+    def test_numeric_postal_code_reaches_silver(self, tmp_path):
+        """Test a numeric postal_code in Bronze is read and stored as text."""
+        writer = RawJsonlGzWriter(base_dir=tmp_path / "bronze", compresslevel=1)
+        writer.write_page(page=1, records=[{"id": "1", "name": "A", "postal_code": 97201}])
+        silver_dir = tmp_path / "silver"
+        _pipeline(writer.base_dir, silver_dir, "delta").run(mode="overwrite")
+
+        silver = DeltaTable(str(silver_dir)).to_pyarrow_table()
+        assert silver.column("postal_code").to_pylist() == ["97201"]
+
+
+class TestDeltaInfo:
+    """Tests for the Delta table info in the run summary."""
+
+    def test_row_count_from_log_stats(self, bronze_dir, tmp_path):
+        """Test the row count is read from the Delta log."""
+        summary = _pipeline(bronze_dir, tmp_path / "silver", "delta").run(mode="overwrite")
+
+        assert summary["delta_info"]["num_rows"] == 3
+
+    def test_row_count_without_log_stats(self, bronze_dir, tmp_path):
+        """Test files missing stats in the log are counted by scanning instead of as 0."""
+        silver_dir = tmp_path / "silver"
+        pipeline = _pipeline(bronze_dir, silver_dir, "delta")
+        pipeline.run(mode="overwrite")
+
+        # Strip the per-file stats, as a writer that skips them would leave the log
+        for log in (silver_dir / "_delta_log").glob("*.json"):
+            actions = [json.loads(line) for line in log.read_text().splitlines()]
+            for action in actions:
+                action.get("add", {}).pop("stats", None)
+            log.write_text("\n".join(json.dumps(action) for action in actions) + "\n")
+
+        assert pipeline._get_delta_info()["num_rows"] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,9 +2,13 @@
 
 import pytest
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from src.transforms.silver_transforms import (
     DuckDBTransformer,
+    SILVER_SCHEMA,
+    VALID_BREWERY_TYPES,
     transform_bronze_to_silver,
     get_transformation_summary,
     arrow_table_from_pylist,
@@ -13,9 +17,21 @@ from src.transforms.silver_transforms import (
 )
 
 
-@pytest.fixture
+# Bronze columns used by the sample data; all raw API values arrive as strings
+BRONZE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("name", pa.string()),
+    ("brewery_type", pa.string()),
+    ("country", pa.string()),
+    ("state_province", pa.string()),
+    ("longitude", pa.string()),
+    ("latitude", pa.string()),
+])
+
+
+@pytest.fixture(scope="module")
 def sample_bronze_data():
-    """Create sample Bronze layer data."""
+    """Create sample Bronze layer data (shared; transforms never mutate it)."""
     return [
         {"id": "1", "name": "  Brewery One  ", "brewery_type": "MICRO", "country": "United States", "state_province": "California", "longitude": "-122.4194", "latitude": "37.7749"},
         {"id": "2", "name": "Brewery Two", "brewery_type": "brewpub", "country": "United States", "state_province": "Oregon", "longitude": "-122.6765", "latitude": "45.5231"},
@@ -23,105 +39,193 @@ def sample_bronze_data():
     ]
 
 
+@pytest.fixture(scope="module")
+def sample_bronze_table():
+    """Same Bronze records as a column-built, explicitly typed Arrow table."""
+    columns = {
+        "id": ["1", "2", "3"],
+        "name": ["  Brewery One  ", "Brewery Two", "Dublin Brew"],
+        "brewery_type": ["MICRO", "brewpub", "micro"],
+        "country": ["United States", "United States", "Ireland"],
+        "state_province": ["California", "Oregon", "Dublin"],
+        "longitude": ["-122.4194", "-122.6765", "-6.2603"],
+        "latitude": ["37.7749", "45.5231", "53.3498"],
+    }
+    return pa.Table.from_pydict(columns, schema=BRONZE_SCHEMA)
+
+
+@pytest.fixture(scope="module")
+def transformer():
+    """Single DuckDBTransformer shared by the module's tests."""
+    t = DuckDBTransformer()
+    yield t
+    t.close()
+
+
+@pytest.fixture(scope="module")
+def silver_table(sample_bronze_data, transformer):
+    """sample_bronze_data transformed to Silver once per module."""
+    return transform_bronze_to_silver(sample_bronze_data, transformer=transformer)
+
+
+@pytest.fixture(scope="module")
+def summary(sample_bronze_table, silver_table, transformer):
+    """Summary of the cached Silver table, computed once for the module."""
+    return get_transformation_summary(sample_bronze_table, silver_table, transformer=transformer)
+
+
 class TestDuckDBTransformer:
     """Tests for DuckDBTransformer class."""
     
-    def test_transform_from_list(self, sample_bronze_data):
+    def test_transform_from_list(self, sample_bronze_data, transformer):
         """Test transformation from list."""
-        result = transform_bronze_to_silver(sample_bronze_data)
+        result = transform_bronze_to_silver(sample_bronze_data, transformer=transformer)
         assert isinstance(result, pa.Table)
         assert result.num_rows == 3
     
-    def test_transform_from_arrow(self, sample_bronze_data):
+    def test_transform_from_arrow(self, sample_bronze_table, transformer):
         """Test transformation from PyArrow Table."""
-        table = pa.Table.from_pylist(sample_bronze_data)
-        result = transform_bronze_to_silver(table)
+        result = transform_bronze_to_silver(sample_bronze_table, transformer=transformer)
         assert isinstance(result, pa.Table)
         assert result.num_rows == 3
     
-    def test_brewery_type_lowercase(self, sample_bronze_data):
+    def test_transform_from_arrow_missing_columns(self, transformer):
+        """Test Arrow input without optional columns gets nulls."""
+        table = pa.table({"id": ["1"], "name": ["A"]})
+        result = transform_bronze_to_silver(table, transformer=transformer)
+        assert result.num_rows == 1
+        absent = [col for col in result.column_names if col not in ("id", "name", "country", "state_province")]
+        assert all(result[col].null_count == result.num_rows for col in absent)
+    
+    def test_brewery_type_lowercase(self, silver_table):
         """Test brewery types are lowercase."""
-        result = transform_bronze_to_silver(sample_bronze_data)
-        types = get_column_as_list(result, "brewery_type")
+        types = get_column_as_list(silver_table, "brewery_type")
         assert "micro" in types
         assert "MICRO" not in types
     
-    def test_string_trimming(self, sample_bronze_data):
+    def test_brewery_type_dictionary_encoded(self, silver_table):
+        """Test brewery_type is dictionary-encoded and output matches SILVER_SCHEMA."""
+        assert pa.types.is_dictionary(silver_table.schema.field("brewery_type").type)
+        assert silver_table.schema.equals(SILVER_SCHEMA)
+    
+    def test_unknown_brewery_type_warns(self, caplog, transformer):
+        """Test unknown brewery types are logged but kept."""
+        data = [{"id": "1", "name": "A", "brewery_type": "Taproom"}]
+        with caplog.at_level("WARNING"):
+            result = transform_bronze_to_silver(data, transformer=transformer)
+        assert get_column_as_list(result, "brewery_type") == ["taproom"]
+        assert "taproom" in caplog.text
+    
+    def test_all_valid_types_accepted(self, caplog, transformer):
+        """Test every valid brewery type passes through in one batch without warnings."""
+        valid_types = sorted(VALID_BREWERY_TYPES)
+        table = pa.table({
+            "id": [f"{i:03d}" for i in range(len(valid_types))],
+            "brewery_type": valid_types,
+        })
+        with caplog.at_level("WARNING"):
+            result = transform_bronze_to_silver(table, transformer=transformer)
+        assert get_column_as_list(result, "brewery_type") == valid_types
+        assert "Unknown brewery types" not in caplog.text
+    
+    def test_string_trimming(self, silver_table):
         """Test strings are trimmed."""
-        result = transform_bronze_to_silver(sample_bronze_data)
-        names = get_column_as_list(result, "name")
+        names = get_column_as_list(silver_table, "name")
         assert "Brewery One" in names
     
-    def test_deduplication(self):
+    def test_deduplication(self, transformer):
         """Test duplicates are removed."""
         data = [
             {"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA"},
             {"id": "1", "name": "A2", "brewery_type": "micro", "country": "US", "state_province": "CA"},
             {"id": "2", "name": "B", "brewery_type": "nano", "country": "US", "state_province": "OR"},
         ]
-        result = transform_bronze_to_silver(data)
+        result = transform_bronze_to_silver(data, transformer=transformer)
         assert result.num_rows == 2
+        assert pc.count_distinct(result["id"]).as_py() == result.num_rows
+    
+    def test_non_string_text_values_cast(self, transformer):
+        """Test numeric values in text columns are cast to strings."""
+        data = [{"id": "1", "name": "A", "brewery_type": "micro", "postal_code": 94107}]
+        result = transform_bronze_to_silver(data, transformer=transformer)
+        assert get_column_as_list(result, "postal_code") == ["94107"]
     
-    def test_null_id_removed(self):
+    def test_null_id_removed(self, transformer):
         """Test records with null ID are removed."""
         data = [
             {"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA"},
             {"id": None, "name": "B", "brewery_type": "micro", "country": "US", "state_province": "CA"},
         ]
-        result = transform_bronze_to_silver(data)
+        result = transform_bronze_to_silver(data, transformer=transformer)
         assert result.num_rows == 1
     
-    def test_empty_country_becomes_unknown(self):
-        """Test empty country becomes 'Unknown'."""
-        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "", "state_province": "CA"}]
-        result = transform_bronze_to_silver(data)
-        countries = get_column_as_list(result, "country")
-        assert countries[0] == "Unknown"
+    def test_missing_partition_values_become_unknown(self, transformer):
+        """Test null, empty and blank country/state become 'Unknown' while real values pass through."""
+        table = pa.table({
+            "id": ["1", "2", "3", "4"],
+            "country": [None, "United States", "", "  "],
+            "state_province": ["Oregon", None, "", "  "],
+        })
+        result = transform_bronze_to_silver(table, transformer=transformer)
+        assert get_column_as_list(result, "country") == ["Unknown", "United States", "Unknown", "Unknown"]
+        assert get_column_as_list(result, "state_province") == ["Oregon", "Unknown", "Unknown", "Unknown"]
+
+
+class TestConvenienceFunctions:
+    """Tests for the module-level wrappers."""
+    
+    def test_standalone_matches_shared(self, sample_bronze_data, transformer):
+        """Test a throwaway transformer gives the same result as the shared one."""
+        standalone = transform_bronze_to_silver(sample_bronze_data)
+        shared = transform_bronze_to_silver(sample_bronze_data, transformer=transformer)
+        assert standalone.equals(shared)
+    
+    def test_shared_transformer_left_open(self, sample_bronze_data, transformer):
+        """Test a caller-supplied transformer is not closed by the wrapper."""
+        transform_bronze_to_silver(sample_bronze_data, transformer=transformer)
+        assert transformer.conn.execute("SELECT 1").fetchone() == (1,)
+
+
+class TestTransformAndWrite:
+    """Tests for writing Parquet directly from DuckDB."""
+    
+    def test_writes_partitioned_parquet(self, sample_bronze_data, tmp_path, transformer):
+        """Test rows land in country/state partitions."""
+        written = transformer.transform_and_write(sample_bronze_data, tmp_path)
+        
+        assert written == 3
+        assert (tmp_path / "country=Ireland" / "state_province=Dublin").is_dir()
+        assert pq.read_table(tmp_path).num_rows == 3
     
-    def test_empty_state_becomes_unknown(self):
-        """Test empty state becomes 'Unknown'."""
-        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": ""}]
-        result = transform_bronze_to_silver(data)
-        states = get_column_as_list(result, "state_province")
-        assert states[0] == "Unknown"
+    def test_empty_list_writes_nothing(self, tmp_path, transformer):
+        """Test empty input writes no files."""
+        assert transformer.transform_and_write([], tmp_path) == 0
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_unknown_brewery_type_warns(self, caplog, tmp_path, transformer):
+        """Test the Parquet path logs unknown brewery types like the Arrow path."""
+        data = [{"id": "1", "name": "A", "brewery_type": " Taproom ", "country": "US"}]
+        with caplog.at_level("WARNING"):
+            transformer.transform_and_write(data, tmp_path)
+        assert "taproom" in caplog.text
 
 
 class TestCoordinateValidation:
     """Tests for coordinate validation."""
     
-    def test_valid_coordinates(self):
-        """Test valid coordinates are kept."""
-        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": "37.7749", "longitude": "-122.4194"}]
-        result = transform_bronze_to_silver(data)
-        lat = get_column_as_list(result, "latitude")[0]
-        lon = get_column_as_list(result, "longitude")[0]
-        assert abs(lat - 37.7749) < 0.001
-        assert abs(lon - (-122.4194)) < 0.001
-    
-    def test_invalid_latitude_null(self):
-        """Test invalid latitude becomes NULL."""
-        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": "100", "longitude": "-122"}]
-        result = transform_bronze_to_silver(data)
-        lat = get_column_as_list(result, "latitude")[0]
-        assert lat is None
-    
-    def test_invalid_longitude_null(self):
-        """Test invalid longitude becomes NULL."""
-        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": "37", "longitude": "-200"}]
-        result = transform_bronze_to_silver(data)
-        lon = get_column_as_list(result, "longitude")[0]
-        assert lon is None
-    
-    def test_boundary_coordinates(self):
-        """Test boundary coordinates are valid."""
-        data = [
-            {"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": "90", "longitude": "180"},
-            {"id": "2", "name": "B", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": "-90", "longitude": "-180"},
-        ]
-        result = transform_bronze_to_silver(data)
-        lats = get_column_as_list(result, "latitude")
-        assert lats[0] == 90
-        assert lats[1] == -90
+    @pytest.mark.parametrize("latitude, longitude, expected_lat, expected_lon", [
+        ("37.7749", "-122.4194", 37.7749, -122.4194),
+        ("100", "-122", None, -122.0),
+        ("37", "-200", 37.0, None),
+        ("90", "180", 90.0, 180.0),
+        ("-90", "-180", -90.0, -180.0),
+    ], ids=["valid", "invalid_latitude", "invalid_longitude", "upper_boundary", "lower_boundary"])
+    def test_coordinates(self, transformer, latitude, longitude, expected_lat, expected_lon):
+        """Test in-range coordinates are kept and out-of-range ones become NULL."""
+        data = [{"id": "1", "name": "A", "brewery_type": "micro", "country": "US", "state_province": "CA", "latitude": latitude, "longitude": longitude}]
+        result = transform_bronze_to_silver(data, transformer=transformer)
+        assert result["latitude"].equals(pa.chunked_array([[expected_lat]], pa.float64()))
+        assert result["longitude"].equals(pa.chunked_array([[expected_lon]], pa.float64()))
 
 
 class TestHelperFunctions:
@@ -129,30 +233,29 @@ class TestHelperFunctions:
     
     def test_arrow_table_from_pylist(self, sample_bronze_data):
         """Test arrow_table_from_pylist."""
-        table = arrow_table_from_pylist(sample_bronze_data)
+        table = arrow_table_from_pylist(sample_bronze_data, schema=BRONZE_SCHEMA)
         assert isinstance(table, pa.Table)
         assert table.num_rows == 3
+        assert table.schema.equals(BRONZE_SCHEMA)
     
-    def test_arrow_table_to_pylist(self, sample_bronze_data):
+    def test_arrow_table_to_pylist(self, sample_bronze_table):
         """Test arrow_table_to_pylist."""
-        table = pa.Table.from_pylist(sample_bronze_data)
-        result = arrow_table_to_pylist(table)
+        result = arrow_table_to_pylist(sample_bronze_table)
         assert isinstance(result, list)
         assert len(result) == 3
     
-    def test_get_column_as_list(self, sample_bronze_data):
+    def test_get_column_as_list(self, sample_bronze_table):
         """Test get_column_as_list."""
-        table = pa.Table.from_pylist(sample_bronze_data)
-        ids = get_column_as_list(table, "id")
+        ids = get_column_as_list(sample_bronze_table, "id")
         assert ids == ["1", "2", "3"]
 
 
 class TestEmptyData:
     """Tests for empty data handling."""
     
-    def test_empty_list(self):
+    def test_empty_list(self, transformer):
         """Test transformation with empty list."""
-        result = transform_bronze_to_silver([])
+        result = transform_bronze_to_silver([], transformer=transformer)
         assert isinstance(result, pa.Table)
         assert result.num_rows == 0
 
@@ -160,24 +263,30 @@ class TestEmptyData:
 class TestTransformationSummary:
     """Tests for transformation summary."""
     
-    def test_summary_keys(self, sample_bronze_data):
+    def test_summary_keys(self, summary):
         """Test summary contains expected keys."""
-        bronze = pa.Table.from_pylist(sample_bronze_data)
-        silver = transform_bronze_to_silver(sample_bronze_data)
-        summary = get_transformation_summary(bronze, silver)
-        
         assert "bronze_record_count" in summary
         assert "silver_record_count" in summary
         assert "records_removed" in summary
     
-    def test_summary_counts(self, sample_bronze_data):
+    def test_summary_counts(self, summary):
         """Test summary counts are correct."""
-        bronze = pa.Table.from_pylist(sample_bronze_data)
-        silver = transform_bronze_to_silver(sample_bronze_data)
-        summary = get_transformation_summary(bronze, silver)
-        
         assert summary["bronze_record_count"] == 3
         assert summary["silver_record_count"] == 3
+    
+    def test_summary_null_counts(self, summary):
+        """Test null counts are reported per Silver column."""
+        assert summary["null_counts"]["id"] == 0
+        assert summary["null_counts"]["city"] == 3
+    
+    def test_summary_stats_reused(self, sample_bronze_table, silver_table, transformer, summary):
+        """Test a repeated summary of the same table reuses the memoized stats."""
+        first = transformer.get_transformation_summary(sample_bronze_table, silver_table)
+        again = transformer.get_transformation_summary(sample_bronze_table, silver_table)
+        
+        assert again == summary
+        assert again["null_counts"] is first["null_counts"]
+        assert again["unique_countries"] == 2
 
 
 if __name__ == "__main__":